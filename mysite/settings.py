@@ -84,6 +84,8 @@ DATABASES = {
         'PORT': '3367',
         'TEST': {
             'NAME': 'mytestdatabase',
+            'CHARSET': 'utf8',
+            'COLLATION': 'utf8_general_ci',
         },
     }
 }
@@ -0,0 +1,51 @@
+"""
+Django settings for running the mysite test suite.
+
+Usage: python manage.py test polls --settings=mysite.settings_test
+
+Tests run against an in-memory SQLite database, which avoids a network
+round-trip to MySQL for every statement.
+Users created by tests are hashed with MD5 instead of PBKDF2.
+Migrations are skipped and the test tables are created straight from the
+models; polls' migrations only contain schema operations.
+"""
+
+from .settings import *  # noqa
+
+
+# Database
+# https://docs.djangoproject.com/en/2.0/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {
+            'NAME': ':memory:',
+        },
+    }
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/2.0/topics/testing/overview/#password-hashing
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+
+# Migrations
+# https://docs.djangoproject.com/en/2.0/ref/settings/#migration-modules
+
+class DisableMigrations:
+    """Report every app as having no migrations module."""
+
+    def __contains__(self, app_label):
+        return True
+
+    def __getitem__(self, app_label):
+        return None
+
+
+MIGRATION_MODULES = DisableMigrations()
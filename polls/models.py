@@ -1,6 +1,7 @@
 import datetime
 
 from django.db import models
+from django.db.models import F
 from django.utils import timezone
 
 
@@ -23,5 +24,11 @@ class Choice(models.Model):
     choice_text = models.CharField(max_length=200)
     votes = models.IntegerField(default=0)
 
+    def vote(self):
+        """
+        Add one vote in the database, so concurrent votes are not lost.
+        """
+        Choice.objects.filter(pk=self.pk).update(votes=F('votes') + 1)
+
     def __str__(self):
         return self.choice_text
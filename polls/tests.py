@@ -1,12 +1,23 @@
 import datetime
+from unittest import mock
 
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, tag
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.html import escape
 
 from .models import Choice, Question
+from .views import DetailView, IndexView, ResultsView
 
+NO_CHOICE_MESSAGE = escape("your didn't select a choice")
+
+
+def offset(now = None, days = 0, **kwargs):
+    """
+    Return `now` (defaults to the current time) shifted by `days` plus any
+    other timedelta `kwargs`.
+    """
+    return (now or timezone.now()) + datetime.timedelta(days = days, **kwargs)
 
 def create_question(question_text, days):
     """
@@ -14,18 +25,56 @@ def create_question(question_text, days):
     give number of `days` offset to now (negative for questions published
     in the past, positive for questions that have yet not published)
     """
-    time = timezone.now() + datetime.timedelta(days = days)
+    time = offset(days = days)
     return Question.objects.create(question_text = question_text, pub_date = time)
 
+def make_question(question_text = '', days = 0, now = None, **kwargs):
+    """
+    Build an unsaved question published `days` (plus any other timedelta
+    `kwargs`) offset to `now`, for tests that never query the database.
+    """
+    time = offset(now, days, **kwargs)
+    return Question(question_text = question_text, pub_date = time)
+
+def make_choices(question, texts_votes):
+    """
+    Create a choice on `question` for every `(choice_text, votes)` pair in
+    `texts_votes` with a single INSERT.
+    """
+    Choice.objects.bulk_create([
+        Choice(question_id = question.id, choice_text = text, votes = votes)
+        for text, votes in texts_votes
+    ])
+
+class ViewTestCase(TestCase):
+    """
+    Base class for view tests, sharing a request factory and the index URL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.factory = RequestFactory()
+        cls.index_url = reverse('polls:index')
+
 class QuestionModelTests(TestCase):
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+
+    def setUp(self):
+        # Freeze the clock was_published_recently() reads, so the
+        # boundary checks don't depend on how long the test takes.
+        patcher = mock.patch('django.utils.timezone.now', return_value = self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_was_published_recently_with_future_question(self):
         """
         was_published_recently() returns False for questions whose pub_date
         is in the future.
         """
-        time = timezone.now() + datetime.timedelta(days = 30)
-        future_question = Question(pub_date = time)
+        future_question = make_question(days = 30, now = self.now)
         self.assertIs(future_question.was_published_recently(), False)
 
     def test_was_published_recently_with_old_question(self):
@@ -33,8 +82,7 @@ class QuestionModelTests(TestCase):
         was_published_recently() returns False for questions whose pub_date
         is old than 1 day.
         """
-        time = timezone.now() - datetime.timedelta(days = 30)
-        old_question = Question(pub_date = time)
+        old_question = make_question(days = -30, now = self.now)
         self.assertIs(old_question.was_published_recently(), False)
 
     def test_was_published_recently_with_recent_question(self):
@@ -42,77 +90,118 @@ class QuestionModelTests(TestCase):
         was_published_recently() return True for question whose pub_date
         is within last day.
         """
-        time = timezone.now() - datetime.timedelta(hours = 23, minutes = 59, seconds = 59)
-        recent_question = Question(pub_date = time)
+        recent_question = make_question(now = self.now, hours = -23, minutes = -59, seconds = -59)
         self.assertIs(recent_question.was_published_recently(), True)
 
-class QuestionIndexviewTests(TestCase):
+class ChoiceModelTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.choice = Choice.objects.create(question = create_question("Question.", days = -5))
+
+    def test_vote(self):
+        """
+        vote() increments the choice's votes by 1.
+        """
+        self.choice.vote()
+        self.assertEqual(Choice.objects.get(pk = self.choice.id).votes, 1)
+
+class QuestionIndexviewNoQuestionTests(ViewTestCase):
 
     def test_no_questions(self):
         """
         If no questions exist, an appropriate message is displayed.
         """
-        response = self.client.get(reverse('polls:index'))
+        response = IndexView.as_view()(self.factory.get(self.index_url))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "No polls are available.")
-        self.assertQuerysetEqual(response.context["latest_question_list"], [])
+        self.assertQuerysetEqual(response.context_data["latest_question_list"], [])
+
+class QuestionIndexviewFutureQuestionTests(ViewTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.future_question = create_question(question_text = "Future question.", days = 30)
+
+    def test_future_questions(self):
+        """
+        Questions with a pub_date in the future aren't displayed on
+        the index page.
+        """
+        response = IndexView.as_view()(self.factory.get(self.index_url))
+        self.assertContains(response, "No polls are available.")
+        self.assertQuerysetEqual(response.context_data['latest_question_list'], [])
+
+class QuestionIndexviewPastQuestionTests(ViewTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.past_question = create_question(question_text = "Past question.", days = -30)
 
     def test_past_questions(self):
         """
         Questions with a pub_date in the past are displayed on the
         index page.
         """
-        create_question(question_text = "Past question.", days = -30)
-        response = self.client.get(reverse('polls:index'))
+        response = IndexView.as_view()(self.factory.get(self.index_url))
         self.assertQuerysetEqual(
-            response.context['latest_question_list'],
-            ['<Question: Past question.>']
+            response.context_data['latest_question_list'],
+            [self.past_question],
+            transform = lambda question: question
         )
 
-    def test_future_questions(self):
-        """
-        Questions with a pub_date in the future aren't displayed on
-        the index page.
-        """
-        create_question(question_text = "Future question.", days = 30)
-        response = self.client.get(reverse('polls:index'))
-        self.assertContains(response, "No polls are available.")
-        self.assertQuerysetEqual(response.context['latest_question_list'], [])
+class QuestionIndexviewTests(ViewTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.past_question = create_question(question_text = "Past question.", days = -30)
+        cls.past_question_2 = create_question(question_text = "Past question 2.", days = -5)
+        cls.future_question = create_question(question_text = "Future question.", days = 30)
 
     def test_future_and_past_questions(self):
         """
         Even if both past and future question exist, only past questions
         are displayed.
         """
-        create_question(question_text = "Past question.", days = -30)
-        create_question(question_text = "Future question.", days = 30)
-        response = self.client.get(reverse('polls:index'))
+        response = IndexView.as_view()(self.factory.get(self.index_url))
+        self.assertNotContains(response, "Future question.")
         self.assertQuerysetEqual(
-            response.context['latest_question_list'],
-            ['<Question: Past question.>']
+            response.context_data['latest_question_list'],
+            [self.past_question_2, self.past_question],
+            transform = lambda question: question
         )
 
     def test_two_past_questions(self):
         """
         The questions index page may display multiple questions.
         """
-        create_question(question_text = "Past question 1.", days = -30)
-        create_question(question_text = "Past question 2.", days = -5)
-        response = self.client.get(reverse('polls:index'))
+        response = IndexView.as_view()(self.factory.get(self.index_url))
         self.assertQuerysetEqual(
-            response.context['latest_question_list'],
-            ['<Question: Past question 2.>', '<Question: Past question 1.>']
+            response.context_data['latest_question_list'],
+            [self.past_question_2, self.past_question],
+            transform = lambda question: question
         )
 
-class QuestionDetailViewTests(TestCase):
+class QuestionDetailViewTests(ViewTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.past_question = create_question(question_text = "Past question.", days = -5)
+        cls.future_question = create_question(question_text = "Future question.", days = 5)
+        cls.past_url = reverse('polls:detail', args = (cls.past_question.id,))
+        cls.future_url = reverse('polls:detail', args = (cls.future_question.id,))
+
+    @tag('integration')
     def test_future_questions(self):
         """
         The detail view of a question with a pub_date in the future
         returns a 404 not found.
         """
-        future_question = create_question(question_text = "Future question.", days = 5)
-        url = reverse('polls:detail', args = (future_question.id,))
-        response = self.client.get(url)
+        response = self.client.get(self.future_url)
         self.assertEqual(response.status_code, 404)
 
     def test_past_questions(self):
@@ -120,64 +209,86 @@ class QuestionDetailViewTests(TestCase):
         The detail view of a question with a pub_date in the past
         display the question's text.
         """
-        past_question = create_question(question_text = "Past question.", days = -5)
-        url = reverse('polls:detail', args = (past_question.id,))
-        response = self.client.get(url)
-        self.assertContains(response, past_question.question_text)
+        request = self.factory.get(self.past_url)
+        response = DetailView.as_view()(request, pk = self.past_question.id)
+        self.assertContains(response, self.past_question.question_text)
 
-class VoteViewTests(TestCase):
-    def test_vote_not_exist_questions(self):
+@tag('integration')
+class NotExistQuestionViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.urls = {
+            name: reverse(name, args = (1,))
+            for name in ('polls:detail', 'polls:vote', 'polls:results')
+        }
+
+    def test_not_exist_questions(self):
         """
-        The vote view of a question not exist
-        returns a 404 not found.
+        The detail, vote and results views of a question not exist
+        return a 404 not found.
         """
-        url = reverse('polls:vote', args = (1,))
-        response = self.client.post(url)
-        self.assertEqual(response.status_code, 404)
+        for name, url in self.urls.items():
+            with self.subTest(name = name):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+@tag('integration')
+class VoteViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.no_choice_question = create_question(question_text = 'No choice question.', days = -5)
+        cls.question = create_question(question_text = "One vote question.", days = -5)
+        cls.choice = Choice.objects.create(
+            choice_text = "One vote choice.",
+            question_id = cls.question.id
+        )
+        cls.vote_url = reverse('polls:vote', args = (cls.question.id,))
+        cls.no_choice_vote_url = reverse('polls:vote', args = (cls.no_choice_question.id,))
+        cls.results_url = reverse('polls:results', args = (cls.question.id,))
 
     def test_vote_not_exist_choices(self):
         """
         The vote view of a choice not exist
         display your didn't select a choice
         """
-        question = create_question(question_text = 'No choice question.', days = -5)
-        url = reverse('polls:vote', args = (question.id,))
-        response = self.client.post(url)
+        response = self.client.post(self.no_choice_vote_url)
         self.assertTemplateUsed(response, 'polls/detail.html')
-        self.assertContains(response, escape("your didn't select a choice"))
+        self.assertContains(response, NO_CHOICE_MESSAGE)
 
     def test_vote_questions(self):
         """
         The vote view of a question
         display the 1 vote.
         """
-        question = create_question(question_text = "One vote question.", days = -5)
-        choice = Choice.objects.create(
-            choice_text = "One vote choice.",
-            question_id = question.id
-        )
-        url = reverse('polls:vote', args = (question.id,))
-        response = self.client.post(url, {'choice': choice.id})
-        self.assertRedirects(response, reverse('polls:results', args=(question.id,)))
+        response = self.client.post(self.vote_url, {'choice': self.choice.id})
+        self.assertRedirects(response, self.results_url)
+        self.assertEqual(Choice.objects.get(pk = self.choice.id).votes, 1)
 
-class ResultsViewTests(TestCase):
-    def test_not_exist_questions(self):
-        """
-        The results view of a question not exist
-        returns a 404 not found.
-        """
-        url = reverse('polls:results', args = (1,))
-        response = self.client.get(url)
-        self.assertEqual(response.status_code, 404)
+class ResultsViewTests(ViewTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.no_choice_question = create_question(question_text = "No choice question.", days = -5)
+        cls.one_choice_question = create_question(question_text = "One choice question.", days = -5)
+        make_choices(cls.one_choice_question, [("Choice text.", 0)])
+        cls.one_vote_question = create_question(question_text = "One vote question.", days = -5)
+        make_choices(cls.one_vote_question, [("One vote choice.", 1)])
+        cls.many_choice_question = create_question(question_text = "Many choice question.", days = -5)
+        make_choices(cls.many_choice_question, [("Choice %s." % i, 0) for i in range(5)])
+        cls.no_choice_url = reverse('polls:results', args = (cls.no_choice_question.id,))
+        cls.one_choice_url = reverse('polls:results', args = (cls.one_choice_question.id,))
+        cls.one_vote_url = reverse('polls:results', args = (cls.one_vote_question.id,))
+        cls.many_choice_url = reverse('polls:results', args = (cls.many_choice_question.id,))
 
     def test_no_choice_questions(self):
         """
         The results view of a question without choice
         display the question's text.
         """
-        question = create_question(question_text = "No choice question.", days = -5)
-        url = reverse('polls:results', args = (question.id,))
-        response = self.client.get(url)
+        request = self.factory.get(self.no_choice_url)
+        response = ResultsView.as_view()(request, pk = self.no_choice_question.id)
         self.assertContains(response, "No choice question.")
 
     def test_one_choice_questions(self):
@@ -185,10 +296,10 @@ class ResultsViewTests(TestCase):
         The results view of a quesiton with one choice
         display the choice_text.
         """
-        question = create_question(question_text = "One choice question.", days = -5)
-        Choice.objects.create(choice_text = "Choice text.", question_id = question.id)
-        url = reverse('polls:results', args = (question.id,))
-        response = self.client.get(url)
+        request = self.factory.get(self.one_choice_url)
+        with self.assertNumQueries(2):
+            response = ResultsView.as_view()(request, pk = self.one_choice_question.id)
+            response.render()
         self.assertContains(response, "Choice text.")
 
     def test_one_vote_choice_question(self):
@@ -196,12 +307,20 @@ class ResultsViewTests(TestCase):
         The results view of a question with one vote
         display the 1 vote.
         """
-        question = create_question(question_text = "One vote question.", days = -5)
-        Choice.objects.create(
-            choice_text = "One vote choice.",
-            question_id = question.id,
-            votes = 1
-        )
-        url = reverse('polls:results', args = (question.id,))
-        response = self.client.get(url)
+        request = self.factory.get(self.one_vote_url)
+        with self.assertNumQueries(2):
+            response = ResultsView.as_view()(request, pk = self.one_vote_question.id)
+            response.render()
         self.assertContains(response, "1 vote")
+
+    def test_many_choices_questions(self):
+        """
+        The results view of a question with many choices
+        display every choice with a constant number of queries.
+        """
+        request = self.factory.get(self.many_choice_url)
+        with self.assertNumQueries(2):
+            response = ResultsView.as_view()(request, pk = self.many_choice_question.id)
+            response.render()
+        for i in range(5):
+            self.assertContains(response, "Choice %s." % i)